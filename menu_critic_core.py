@@ -1,15 +1,46 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import io
 import json
 import logging
+import os
+import random
 import re
+import urllib.request
 from dataclasses import dataclass
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Annotated, Any, Awaitable, Callable
 
-from groq import Groq
-from PIL import Image
+from groq import AsyncGroq, Groq
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover - optional speedup
+    fastjsonschema = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional speedup
+    msgspec = None
+
+try:
+    import numpy
+    from turbojpeg import TJPF_RGB, TJSAMP_420, TurboJPEG
+
+    _TURBO_JPEG = TurboJPEG()
+except Exception:  # pragma: no cover - optional speedup, needs libturbojpeg
+    _TURBO_JPEG = None
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +48,53 @@ logger = logging.getLogger(__name__)
 TEXT_MODEL = "openai/gpt-oss-20b"
 VISION_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
 REQUEST_COOLDOWN_SECONDS = 10
+RATE_LIMIT_RETRY_ATTEMPTS = 3
 MAX_TEXT_CHARS = 12_000
 MAX_IMAGE_UPLOAD_BYTES = 8 * 1024 * 1024
 TARGET_IMAGE_BYTES = 3_500_000
 MIN_EXTRACTED_TEXT_CHARS = 20
 MIN_VISION_CONFIDENCE = 0.45
 
+# Rough bits-per-pixel of a photographic JPEG at quality 85, used to seed the
+# single-shot turbojpeg quality estimate.
+JPEG_BPP_AT_Q85 = 1.8
+
+# When set, compressed menu images are PUT under this URL prefix (e.g. a
+# bucket path that authorizes writes, with any auth in the query string) and
+# the vision request references the object URL instead of inlining ~4.7MB of
+# base64 into the request body. Each image gets a content-addressed object
+# name, so concurrent sessions never overwrite each other's upload.
+IMAGE_UPLOAD_URL_ENV = "IMAGE_UPLOAD_URL"
+
+_VOWELS = frozenset("aeiou")
+
+_MENU_WORDS = (
+    "menu",
+    "burger",
+    "pizza",
+    "salad",
+    "drink",
+    "appetizer",
+    "dessert",
+    "chicken",
+    "fries",
+    "soup",
+    "sandwich",
+    "pasta",
+    "rice",
+    "combo",
+    "add on",
+    "addons",
+)
+
+_TOKEN_RE = re.compile(r"[A-Za-z]{2,}")
+_PRICE_RE = re.compile(r"[$€£]\s?\d|\b\d{1,3}\.\d{2}\b")
+
+# Compiled alternation over the vocabulary: one scan of the input with
+# substring semantics, so plural and compound forms ("sandwiches",
+# "cheeseburgers") keep matching just like the original per-word scan.
+_MENU_WORD_RE = re.compile("|".join(re.escape(w) for w in _MENU_WORDS))
+
 SCORE_KEYS = [
     "clarity",
     "pricing_psychology",
@@ -107,6 +179,52 @@ CRITIQUE_JSON_SCHEMA: dict[str, Any] = {
     },
 }
 
+# Compiled once at import: fastjsonschema emits a specialized validator
+# function for the fixed critique schema instead of walking it generically.
+_VALIDATE_CRITIQUE = (
+    fastjsonschema.compile(CRITIQUE_JSON_SCHEMA) if fastjsonschema is not None else None
+)
+
+if msgspec is not None:
+    # msgspec mirrors CRITIQUE_JSON_SCHEMA so parsing and validation of the
+    # critique response happen in a single C-level pass.
+    _Score = Annotated[int, msgspec.Meta(ge=0, le=100)]
+
+    class _Scores(msgspec.Struct, forbid_unknown_fields=True):
+        clarity: _Score
+        pricing_psychology: _Score
+        upsell_potential: _Score
+        menu_structure: _Score
+        dietary_signals: _Score
+
+    class _RevenueLevers(msgspec.Struct, forbid_unknown_fields=True):
+        conversion: list[str]
+        aov: list[str]
+        margin: list[str]
+
+    class _RewriteExample(msgspec.Struct, forbid_unknown_fields=True):
+        original: str
+        rewritten: str
+        why_it_helps: str
+
+    class _AbTest(msgspec.Struct, forbid_unknown_fields=True):
+        hypothesis: str
+        variant_a: str
+        variant_b: str
+        success_metric: str
+
+    class _Critique(msgspec.Struct, forbid_unknown_fields=True):
+        scores: _Scores
+        top_5_changes: Annotated[list[str], msgspec.Meta(min_length=1, max_length=5)]
+        revenue_levers: _RevenueLevers
+        rewrite_examples: list[_RewriteExample]
+        ab_tests: list[_AbTest]
+        red_flags: list[str]
+
+    _CRITIQUE_DECODER = msgspec.json.Decoder(_Critique)
+else:
+    _CRITIQUE_DECODER = None
+
 
 @dataclass
 class VisionExtractionResult:
@@ -146,6 +264,14 @@ class SuspiciousMenuInputError(MenuCriticError):
     pass
 
 
+def _json_loads(text: str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    # keep catching the stdlib type regardless of which parser ran.
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 def _usage_from_response(resp: Any) -> dict[str, int | None]:
     usage = getattr(resp, "usage", None)
     if usage is None:
@@ -161,7 +287,10 @@ def _usage_from_response(resp: Any) -> dict[str, int | None]:
     }
 
 
+@lru_cache(maxsize=4)
 def get_groq_client(api_key: str | None) -> Groq:
+    """Return a Groq client for the given key, reused across calls so the
+    underlying httpx connection pool (and its TLS handshakes) survive."""
     if not api_key:
         logger.warning("Groq client setup failed: missing GROQ_API_KEY.")
         raise GroqSetupError("Missing GROQ_API_KEY")
@@ -169,6 +298,36 @@ def get_groq_client(api_key: str | None) -> Groq:
     return Groq(api_key=api_key)
 
 
+@lru_cache(maxsize=4)
+def get_async_groq_client(api_key: str | None) -> AsyncGroq:
+    if not api_key:
+        logger.warning("Groq client setup failed: missing GROQ_API_KEY.")
+        raise GroqSetupError("Missing GROQ_API_KEY")
+    logger.debug("Initializing async Groq client.")
+    return AsyncGroq(api_key=api_key)
+
+
+async def _retry_rate_limited(request: Callable[[], Awaitable[Any]]) -> Any:
+    """Run an async request, retrying rate-limit-like failures with jittered
+    exponential backoff. Other errors propagate immediately."""
+    delay = 1.0
+    for attempt in range(1, RATE_LIMIT_RETRY_ATTEMPTS + 1):
+        try:
+            return await request()
+        except RateLimitLikeError:
+            if attempt == RATE_LIMIT_RETRY_ATTEMPTS:
+                raise
+            wait = min(20.0, delay * random.uniform(0.5, 1.5))
+            logger.warning(
+                "Groq rate limited; retrying in %.1fs (attempt %s/%s).",
+                wait,
+                attempt,
+                RATE_LIMIT_RETRY_ATTEMPTS,
+            )
+            await asyncio.sleep(wait)
+            delay *= 2
+
+
 def clamp_text_input(text: str) -> str:
     cleaned = (text or "").strip()
     if len(cleaned) > MAX_TEXT_CHARS:
@@ -186,52 +345,51 @@ def validate_menu_like_text(text: str, source: str = "text") -> None:
             f"That {source} input is too short to look like a real menu. Nice try though."
         )
 
-    tokens = re.findall(r"[A-Za-z]{2,}", candidate)
-    if not tokens:
+    # The readable-text guard runs before any early return: a wall of bare
+    # prices or digits must never reach the model. A single regex search is
+    # cheap enough to pay on every call.
+    if _TOKEN_RE.search(lowered) is None:
         raise SuspiciousMenuInputError(
             f"That {source} input does not contain readable menu text."
         )
 
-    alpha_chars = [c for c in candidate if c.isalpha()]
-    vowels = sum(1 for c in alpha_chars if c.lower() in "aeiou")
-    vowel_ratio = (vowels / len(alpha_chars)) if alpha_chars else 0.0
-    long_token_ratio = (
-        sum(1 for t in tokens if len(t) >= 9) / len(tokens)
-        if tokens
-        else 1.0
-    )
-    has_price = bool(re.search(r"[$€£]\s?\d|\b\d{1,3}\.\d{2}\b", candidate))
+    # Cheap signals next: a long input with prices or line breaks is clearly
+    # menu-like, so skip the tokenization and ratio heuristics entirely.
+    has_price = bool(_PRICE_RE.search(candidate))
     has_line_breaks = candidate.count("\n") >= 2
-    has_menu_words = any(
-        word in lowered
-        for word in [
-            "menu",
-            "burger",
-            "pizza",
-            "salad",
-            "drink",
-            "appetizer",
-            "dessert",
-            "chicken",
-            "fries",
-            "soup",
-            "sandwich",
-            "pasta",
-            "rice",
-            "combo",
-            "add on",
-            "addons",
-        ]
-    )
-
+    if len(candidate) >= 120 and (has_price or has_line_breaks):
+        return
+
+    # One pass over the match iterator collects the token counts the
+    # gibberish heuristics below need.
+    token_count = 0
+    long_token_count = 0
+    for match in _TOKEN_RE.finditer(lowered):
+        token_count += 1
+        if match.end() - match.start() >= 9:
+            long_token_count += 1
+
+    has_menu_words = _MENU_WORD_RE.search(lowered) is not None
+    if len(candidate) >= 120 and has_menu_words:
+        return
+
+    alpha_count = 0
+    vowel_count = 0
+    for c in lowered:
+        if c.isalpha():
+            alpha_count += 1
+            if c in _VOWELS:
+                vowel_count += 1
+    vowel_ratio = (vowel_count / alpha_count) if alpha_count else 0.0
+    long_token_ratio = long_token_count / token_count
     # Catch obvious keyboard-smash / gibberish inputs like "dfdsfsdg".
     if not has_price and not has_line_breaks and not has_menu_words:
-        if len(tokens) <= 3 and (vowel_ratio < 0.22 or long_token_ratio > 0.6):
+        if token_count <= 3 and (vowel_ratio < 0.22 or long_token_ratio > 0.6):
             logger.info(
                 "Rejected suspicious %s input as non-menu text. chars=%s tokens=%s vowel_ratio=%.2f",
                 source,
                 len(candidate),
-                len(tokens),
+                token_count,
                 vowel_ratio,
             )
             raise SuspiciousMenuInputError(
@@ -244,7 +402,7 @@ def validate_menu_like_text(text: str, source: str = "text") -> None:
             "Rejected suspicious %s input due to missing menu signals. chars=%s tokens=%s",
             source,
             len(candidate),
-            len(tokens),
+            token_count,
         )
         raise SuspiciousMenuInputError(
             f"That {source} input doesn't look menu-ish yet. Paste actual menu items or upload a clearer menu image."
@@ -252,17 +410,117 @@ def validate_menu_like_text(text: str, source: str = "text") -> None:
 
 
 def _to_rgb(image: Image.Image) -> Image.Image:
+    from PIL import Image
+
     if image.mode in ("RGBA", "LA"):
         rgba = image.convert("RGBA")
+        alpha = rgba.getchannel("A")
+        if alpha.getextrema() == (255, 255):
+            # Fully opaque despite carrying an alpha channel (common for
+            # phone photos): no need for the white-canvas composite.
+            return rgba.convert("RGB")
         base = Image.new("RGB", rgba.size, (255, 255, 255))
-        base.paste(rgba, mask=rgba.getchannel("A"))
+        base.paste(rgba, mask=alpha)
         return base
     if image.mode == "P":
         return image.convert("RGB")
     return image.convert("RGB")
 
 
-def preprocess_image_for_groq(uploaded_file: Any) -> tuple[str, dict[str, Any]]:
+def _encode_with_turbojpeg(image: Image.Image) -> tuple[bytes, int] | None:
+    # Single-shot libjpeg-turbo encode at a quality estimated from the byte
+    # target, with one corrective re-encode if the estimate overshoots.
+    target_bpp = (TARGET_IMAGE_BYTES * 8) / (image.width * image.height)
+    quality = max(50, min(92, round(85 * target_bpp / JPEG_BPP_AT_Q85)))
+    pixels = numpy.asarray(image)
+    for _ in range(2):
+        # PyTurboJPEG defaults to BGR pixel order; the PIL buffer is RGB.
+        encoded = _TURBO_JPEG.encode(pixels, quality=quality, pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420)
+        if len(encoded) <= TARGET_IMAGE_BYTES:
+            return encoded, quality
+        if quality <= 50:
+            break
+        quality = max(50, int(quality * TARGET_IMAGE_BYTES / len(encoded)))
+    return None
+
+
+def _encode_jpeg_to_target(image: Image.Image) -> tuple[bytes, int]:
+    if _TURBO_JPEG is not None:
+        encoded = _encode_with_turbojpeg(image)
+        if encoded is not None:
+            return encoded
+
+    # Pillow fallback: bisect over quality, at most 5 encodes, keeping the
+    # highest quality that fits the byte target.
+    buffer = io.BytesIO()
+    best: tuple[bytes, int] | None = None
+    lo, hi = 50, 92
+    for _ in range(4):
+        if lo > hi:
+            break
+        quality = (lo + hi) // 2
+        buffer.seek(0)
+        buffer.truncate(0)
+        image.save(buffer, format="JPEG", optimize=True, quality=quality)
+        candidate = buffer.getvalue()
+        if len(candidate) <= TARGET_IMAGE_BYTES:
+            best = (candidate, quality)
+            lo = quality + 1
+        else:
+            hi = quality - 1
+    if best is None:
+        buffer.seek(0)
+        buffer.truncate(0)
+        image.save(buffer, format="JPEG", optimize=True, quality=50)
+        best = (buffer.getvalue(), 50)
+    return best
+
+
+def _upload_image_for_url(jpeg_bytes: bytes) -> str | None:
+    upload_url = os.environ.get(IMAGE_UPLOAD_URL_ENV)
+    if not upload_url:
+        return None
+    # Content-addressed object name under the configured prefix: concurrent
+    # sessions get distinct keys instead of racing on one shared object, and
+    # re-uploading the same image is idempotent.
+    object_name = hashlib.blake2b(jpeg_bytes, digest_size=16).hexdigest() + ".jpg"
+    base_url, _, query = upload_url.partition("?")
+    object_url = base_url.rstrip("/") + "/" + object_name
+    put_url = object_url + "?" + query if query else object_url
+    request = urllib.request.Request(
+        put_url,
+        data=jpeg_bytes,
+        method="PUT",
+        headers={"Content-Type": "image/jpeg"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30):
+            pass
+    except Exception:
+        logger.exception("Image upload to %s target failed; falling back to data URL.", IMAGE_UPLOAD_URL_ENV)
+        return None
+    # Any auth rides in the query string; the bare object URL is what the
+    # vision model fetches.
+    return object_url
+
+
+def _image_url_for_request(image_bytes: bytes) -> str:
+    remote_url = _upload_image_for_url(image_bytes)
+    if remote_url is not None:
+        logger.debug("Vision request will reference uploaded image URL.")
+        return remote_url
+    # Assemble the data URL in one bytearray instead of decoding the base64
+    # payload to str and f-string-copying it again; the payload is multi-MB.
+    url_buf = bytearray(b"data:image/jpeg;base64,")
+    url_buf.extend(base64.b64encode(image_bytes))
+    return url_buf.decode("ascii")
+
+
+def preprocess_image_for_groq(uploaded_file: Any) -> tuple[bytes, dict[str, Any]]:
+    # Imported here rather than at module top so text-only sessions (and the
+    # About/Why pages) never pay the PIL import cost.
+    from PIL import Image
+
     if uploaded_file is None:
         logger.warning("Image preprocessing attempted without an uploaded file.")
         raise ValueError("No image uploaded.")
@@ -277,21 +535,13 @@ def preprocess_image_for_groq(uploaded_file: Any) -> tuple[str, dict[str, Any]]:
     logger.info("Preprocessing image upload: name=%s size=%s bytes", getattr(uploaded_file, "name", None), getattr(uploaded_file, "size", None))
     uploaded_file.seek(0)
     image = Image.open(uploaded_file)
+    # For JPEG sources, draft mode lets libjpeg decode at a reduced IDCT
+    # scale close to the thumbnail size; it is a no-op for other formats.
+    image.draft("RGB", (1600, 1600))
     image = _to_rgb(image)
-    image.thumbnail((1600, 1600))
+    image.thumbnail((1600, 1600), Image.Resampling.LANCZOS)
 
-    buffer = io.BytesIO()
-    jpeg_bytes = b""
-    used_quality = 85
-    for quality in [90, 85, 78, 72, 65, 58, 50]:
-        buffer.seek(0)
-        buffer.truncate(0)
-        image.save(buffer, format="JPEG", optimize=True, quality=quality)
-        candidate = buffer.getvalue()
-        jpeg_bytes = candidate
-        used_quality = quality
-        if len(candidate) <= TARGET_IMAGE_BYTES:
-            break
+    jpeg_bytes, used_quality = _encode_jpeg_to_target(image)
 
     if len(jpeg_bytes) > TARGET_IMAGE_BYTES:
         logger.warning(
@@ -304,8 +554,6 @@ def preprocess_image_for_groq(uploaded_file: Any) -> tuple[str, dict[str, Any]]:
             "or paste menu text instead."
         )
 
-    b64 = base64.b64encode(jpeg_bytes).decode("utf-8")
-    data_url = f"data:image/jpeg;base64,{b64}"
     meta = {
         "width": image.width,
         "height": image.height,
@@ -313,11 +561,13 @@ def preprocess_image_for_groq(uploaded_file: Any) -> tuple[str, dict[str, Any]]:
         "quality": used_quality,
     }
     logger.info("Image preprocessing complete: %s", meta)
-    return data_url, meta
+    return jpeg_bytes, meta
 
 
 def _chat_content_text(resp: Any) -> str:
-    return (resp.choices[0].message.content or "").strip()
+    # No strip here: the JSON parsers tolerate surrounding whitespace, and
+    # stripping eagerly would keep a second copy of a multi-KB payload alive.
+    return resp.choices[0].message.content or ""
 
 
 def _is_rate_limit_error(exc: Exception) -> bool:
@@ -325,47 +575,46 @@ def _is_rate_limit_error(exc: Exception) -> bool:
     return "rate limit" in text or "429" in text or "too many requests" in text
 
 
-def extract_menu_text_from_image(client: Groq, image_data_url: str) -> VisionExtractionResult:
-    system_prompt = (
-        "You extract restaurant menu text from images. Output ONLY valid JSON in English. "
-        "Do not add markdown fences."
-    )
-    user_prompt = (
-        "Read the menu image and extract the visible menu text in English.\n"
-        "Return JSON with keys: menu_text (string), confidence (number 0 to 1), notes (string).\n"
-        "If the image is blurry, obstructed, or not a menu, set confidence below 0.45 and explain in notes.\n"
-        "Preserve line breaks where possible."
-    )
-    try:
-        logger.info("Sending Groq vision extraction request using model=%s.", VISION_MODEL)
-        resp = client.chat.completions.create(
-            model=VISION_MODEL,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": user_prompt},
-                        {"type": "image_url", "image_url": {"url": image_data_url}},
-                    ],
-                },
+_VISION_SYSTEM_PROMPT = (
+    "You extract restaurant menu text from images. Output ONLY valid JSON in English. "
+    "Do not add markdown fences."
+)
+_VISION_USER_PROMPT = (
+    "Read the menu image and extract the visible menu text in English.\n"
+    "Return JSON with keys: menu_text (string), confidence (number 0 to 1), notes (string).\n"
+    "If the image is blurry, obstructed, or not a menu, set confidence below 0.45 and explain in notes.\n"
+    "Preserve line breaks where possible."
+)
+
+
+def _vision_messages(image_data_url: str) -> list[dict[str, Any]]:
+    return [
+        {"role": "system", "content": _VISION_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": _VISION_USER_PROMPT},
+                {"type": "image_url", "image_url": {"url": image_data_url}},
             ],
-        )
-    except Exception as exc:
-        if _is_rate_limit_error(exc):
-            logger.warning("Vision extraction hit rate limit-like error: %s", exc)
-            raise RateLimitLikeError(str(exc)) from exc
-        logger.exception("Vision extraction request failed.")
-        raise VisionExtractionError(f"Vision request failed: {exc}") from exc
+        },
+    ]
 
+
+def _vision_request_error(exc: Exception) -> MenuCriticError:
+    if _is_rate_limit_error(exc):
+        logger.warning("Vision extraction hit rate limit-like error: %s", exc)
+        return RateLimitLikeError(str(exc))
+    logger.exception("Vision extraction request failed.")
+    return VisionExtractionError(f"Vision request failed: {exc}")
+
+
+def _vision_result_from_response(resp: Any) -> VisionExtractionResult:
     raw = _chat_content_text(resp)
     try:
-        data = json.loads(raw)
+        data = _json_loads(raw)
     except json.JSONDecodeError as exc:
         logger.warning("Vision extraction returned invalid JSON. raw_len=%s", len(raw))
-        raise VisionExtractionError("Vision response was not valid JSON.", raw_output=raw) from exc
+        raise VisionExtractionError("Vision response was not valid JSON.", raw_output=raw.strip()) from exc
 
     menu_text = str(data.get("menu_text", "")).strip()
     notes = str(data.get("notes", "")).strip()
@@ -375,11 +624,12 @@ def extract_menu_text_from_image(client: Groq, image_data_url: str) -> VisionExt
     except (TypeError, ValueError):
         confidence = 0.0
     confidence = max(0.0, min(1.0, confidence))
-    logger.info(
-        "Vision extraction complete: confidence=%.2f menu_text_chars=%s",
-        confidence,
-        len(menu_text),
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Vision extraction complete: confidence=%.2f menu_text_chars=%s",
+            confidence,
+            len(menu_text),
+        )
 
     return VisionExtractionResult(
         menu_text=menu_text,
@@ -391,128 +641,232 @@ def extract_menu_text_from_image(client: Groq, image_data_url: str) -> VisionExt
     )
 
 
-def _critique_system_prompt() -> str:
-    return (
-        "You are Menu Critic, an expert in restaurant menu conversion optimization, average order value, "
-        "and customer experience. Always respond in English and output JSON only (no markdown).\n"
-        "If mode is Roast, be funny and specific but never cruel. Roast the menu copy/layout/pricing choices, "
-        "not the owner or any people. No harassment, slurs, or personal attacks.\n"
-        "In Roast mode, use sharper humor, vivid metaphors, playful one-liners, and consultant-style sarcasm "
-        "while still being actionable.\n"
-        "Avoid bland corporate wording in Roast mode. Each major point should sound like a real roast, not a polite audit.\n"
-        "Focus on practical, testable improvements."
-    )
-
+def extract_menu_text_from_image(client: Groq, image_bytes: bytes) -> VisionExtractionResult:
+    # The image URL (base64 data URL or uploaded object URL) is built here,
+    # immediately before the SDK call, so the multi-MB string is a short-lived
+    # temporary rather than being held by the caller for the whole request.
+    try:
+        logger.info("Sending Groq vision extraction request using model=%s.", VISION_MODEL)
+        resp = client.chat.completions.create(
+            model=VISION_MODEL,
+            temperature=0,
+            response_format={"type": "json_object"},
+            messages=_vision_messages(_image_url_for_request(image_bytes)),
+        )
+    except Exception as exc:
+        raise _vision_request_error(exc) from exc
 
-def _critique_user_prompt(menu_text: str, mode: str, goal: str, context: str | None) -> str:
-    safe_context = (context or "").strip() or "Not provided"
-    is_roast = mode.lower().startswith("roast")
-    mode_specific = (
-        "Roast style requirements:\n"
-        "- Make the critique genuinely funny and specific (not generic, not mild).\n"
-        "- Roast the menu writing/structure/pricing like a witty consultant doing stand-up with receipts.\n"
-        "- Every joke must still include a useful fix.\n"
-        "- Keep it playful, not cruel, and never target people.\n"
-        "- `top_5_changes` and `red_flags` should read like punchy roasts with actionable advice.\n"
-        "- Prefer lines that combine a roast + fix in one sentence.\n"
-        "- Use colorful phrasing (examples of tone only): 'reads like a tax form', 'buried like a secret menu witness', "
-        "'priced like it includes a side of rent'.\n"
-        "- Do not overuse the same joke structure.\n"
-        "- `rewrite_examples[].why_it_helps` should keep a witty tone while explaining the conversion logic.\n"
-        "- `ab_tests[].hypothesis` can be playful, but `success_metric` must stay practical.\n\n"
-    ) if is_roast else (
-        "Fix mode requirements:\n"
-        "- Prioritize clarity, revenue impact, and implementation practicality.\n"
-        "- Be direct and operator-friendly.\n\n"
-    )
-    return (
-        "Analyze this restaurant menu and return a critique using the required JSON schema.\n\n"
-        f"Mode: {mode}\n"
-        f"Primary goal: {goal}\n"
-        f"Restaurant context: {safe_context}\n\n"
-        "Scoring guidance:\n"
-        "- clarity: readability, naming, scannability\n"
-        "- pricing_psychology: anchors, decoys, price formatting, value framing\n"
-        "- upsell_potential: combos, add-ons, sizing, pairings\n"
-        "- menu_structure: grouping, flow, hierarchy\n"
-        "- dietary_signals: labels for vegetarian/vegan/gluten-free/allergens\n\n"
-        f"{mode_specific}"
-        "Requirements:\n"
-        "- Provide exactly 5 top_5_changes if possible.\n"
-        "- Rewrite examples should be concrete menu line upgrades.\n"
-        "- In Roast mode, rewrite_examples should preserve the humor in the explanation but keep the rewritten menu line usable.\n"
-        "- A/B tests should be realistic for a restaurant menu or online ordering page.\n"
-        "- Red flags should call out confusing, risky, or conversion-killing issues.\n"
-        "- Keep all output in English.\n\n"
-        "Roast calibration (only if mode is Roast): aim for 7/10 funny, 10/10 useful.\n\n"
-        "Menu text:\n"
-        f"{menu_text}"
-    )
+    return _vision_result_from_response(resp)
 
 
-def _manual_validate_critique(data: Any) -> dict[str, Any]:
-    if not isinstance(data, dict):
-        raise ValueError("Top-level JSON must be an object.")
+async def aextract_menu_text_from_image(
+    client: AsyncGroq, image_bytes: bytes
+) -> VisionExtractionResult:
+    """Async variant of extract_menu_text_from_image with rate-limit retries."""
+    image_url = _image_url_for_request(image_bytes)
 
-    for key in ["scores", "top_5_changes", "revenue_levers", "rewrite_examples", "ab_tests", "red_flags"]:
-        if key not in data:
-            raise ValueError(f"Missing key: {key}")
+    async def _request() -> Any:
+        try:
+            logger.info("Sending async Groq vision extraction request using model=%s.", VISION_MODEL)
+            return await client.chat.completions.create(
+                model=VISION_MODEL,
+                temperature=0,
+                response_format={"type": "json_object"},
+                messages=_vision_messages(image_url),
+            )
+        except Exception as exc:
+            raise _vision_request_error(exc) from exc
+
+    resp = await _retry_rate_limited(_request)
+    return _vision_result_from_response(resp)
+
+
+_CRITIQUE_SYSTEM_PROMPT = (
+    "You are Menu Critic, an expert in restaurant menu conversion optimization, average order value, "
+    "and customer experience. Always respond in English and output JSON only (no markdown).\n"
+    "If mode is Roast, be funny and specific but never cruel. Roast the menu copy/layout/pricing choices, "
+    "not the owner or any people. No harassment, slurs, or personal attacks.\n"
+    "In Roast mode, use sharper humor, vivid metaphors, playful one-liners, and consultant-style sarcasm "
+    "while still being actionable.\n"
+    "Avoid bland corporate wording in Roast mode. Each major point should sound like a real roast, not a polite audit.\n"
+    "Focus on practical, testable improvements."
+)
+
+_ROAST_REQS = (
+    "Roast style requirements:\n"
+    "- Make the critique genuinely funny and specific (not generic, not mild).\n"
+    "- Roast the menu writing/structure/pricing like a witty consultant doing stand-up with receipts.\n"
+    "- Every joke must still include a useful fix.\n"
+    "- Keep it playful, not cruel, and never target people.\n"
+    "- `top_5_changes` and `red_flags` should read like punchy roasts with actionable advice.\n"
+    "- Prefer lines that combine a roast + fix in one sentence.\n"
+    "- Use colorful phrasing (examples of tone only): 'reads like a tax form', 'buried like a secret menu witness', "
+    "'priced like it includes a side of rent'.\n"
+    "- Do not overuse the same joke structure.\n"
+    "- `rewrite_examples[].why_it_helps` should keep a witty tone while explaining the conversion logic.\n"
+    "- `ab_tests[].hypothesis` can be playful, but `success_metric` must stay practical.\n\n"
+)
+
+_FIX_REQS = (
+    "Fix mode requirements:\n"
+    "- Prioritize clarity, revenue impact, and implementation practicality.\n"
+    "- Be direct and operator-friendly.\n\n"
+)
+
+_CRITIQUE_TEMPLATE = (
+    "Analyze this restaurant menu and return a critique using the required JSON schema.\n\n"
+    "Mode: {mode}\n"
+    "Primary goal: {goal}\n"
+    "Restaurant context: {context}\n\n"
+    "Scoring guidance:\n"
+    "- clarity: readability, naming, scannability\n"
+    "- pricing_psychology: anchors, decoys, price formatting, value framing\n"
+    "- upsell_potential: combos, add-ons, sizing, pairings\n"
+    "- menu_structure: grouping, flow, hierarchy\n"
+    "- dietary_signals: labels for vegetarian/vegan/gluten-free/allergens\n\n"
+    "{mode_specific}"
+    "Requirements:\n"
+    "- Provide exactly 5 top_5_changes if possible.\n"
+    "- Rewrite examples should be concrete menu line upgrades.\n"
+    "- In Roast mode, rewrite_examples should preserve the humor in the explanation but keep the rewritten menu line usable.\n"
+    "- A/B tests should be realistic for a restaurant menu or online ordering page.\n"
+    "- Red flags should call out confusing, risky, or conversion-killing issues.\n"
+    "- Keep all output in English.\n\n"
+    "Roast calibration (only if mode is Roast): aim for 7/10 funny, 10/10 useful.\n\n"
+    "Menu text:\n"
+    "{menu_text}"
+)
 
-    scores = data["scores"]
-    if not isinstance(scores, dict):
-        raise ValueError("scores must be an object.")
-    for key in SCORE_KEYS:
-        if key not in scores:
-            raise ValueError(f"scores missing {key}")
-        value = scores[key]
-        if not isinstance(value, int):
-            raise ValueError(f"scores.{key} must be an integer.")
-        if not 0 <= value <= 100:
-            raise ValueError(f"scores.{key} must be 0-100.")
-
-    if not isinstance(data["top_5_changes"], list):
-        raise ValueError("top_5_changes must be a list.")
-    if not all(isinstance(x, str) for x in data["top_5_changes"]):
-        raise ValueError("top_5_changes items must be strings.")
-
-    rev = data["revenue_levers"]
-    if not isinstance(rev, dict):
-        raise ValueError("revenue_levers must be an object.")
-    for k in ["conversion", "aov", "margin"]:
-        if k not in rev or not isinstance(rev[k], list) or not all(isinstance(x, str) for x in rev[k]):
-            raise ValueError(f"revenue_levers.{k} must be a string list.")
-
-    if not isinstance(data["rewrite_examples"], list):
-        raise ValueError("rewrite_examples must be a list.")
-    for item in data["rewrite_examples"]:
-        if not isinstance(item, dict):
-            raise ValueError("rewrite_examples items must be objects.")
-        for k in ["original", "rewritten", "why_it_helps"]:
-            if not isinstance(item.get(k), str):
-                raise ValueError(f"rewrite_examples item missing string '{k}'.")
-
-    if not isinstance(data["ab_tests"], list):
-        raise ValueError("ab_tests must be a list.")
-    for item in data["ab_tests"]:
-        if not isinstance(item, dict):
-            raise ValueError("ab_tests items must be objects.")
-        for k in ["hypothesis", "variant_a", "variant_b", "success_metric"]:
-            if not isinstance(item.get(k), str):
-                raise ValueError(f"ab_tests item missing string '{k}'.")
-
-    if not isinstance(data["red_flags"], list) or not all(isinstance(x, str) for x in data["red_flags"]):
-        raise ValueError("red_flags must be a string list.")
 
-    return data
+def _critique_system_prompt() -> str:
+    return _CRITIQUE_SYSTEM_PROMPT
 
 
-def analyze_menu_text(
-    client: Groq,
+def _critique_user_prompt(
     menu_text: str,
     mode: str,
     goal: str,
-    context: str | None = None,
-) -> tuple[dict[str, Any], str, dict[str, Any]]:
+    context: str | None,
+    is_roast: bool | None = None,
+) -> str:
+    safe_context = (context or "").strip() or "Not provided"
+    if is_roast is None:
+        is_roast = mode.lower().startswith("roast")
+    mode_specific = _ROAST_REQS if is_roast else _FIX_REQS
+    return _CRITIQUE_TEMPLATE.format(
+        mode=mode,
+        goal=goal,
+        context=safe_context,
+        mode_specific=mode_specific,
+        menu_text=menu_text,
+    )
+
+
+def _build_manual_validator() -> Callable[[Any], dict[str, Any]]:
+    """Generate the fallback critique validator as straight-line code.
+
+    Specializing the checks to the fixed schema at import time avoids the
+    per-call loops and repeated isinstance dispatch of a generic walker.
+    """
+    lines = [
+        "def _validate(data):",
+        "    if not isinstance(data, dict):",
+        "        raise ValueError('Top-level JSON must be an object.')",
+    ]
+    for key in ("scores", "top_5_changes", "revenue_levers", "rewrite_examples", "ab_tests", "red_flags"):
+        lines += [
+            f"    if {key!r} not in data:",
+            f"        raise ValueError('Missing key: {key}')",
+        ]
+    lines += [
+        "    scores = data['scores']",
+        "    if not isinstance(scores, dict):",
+        "        raise ValueError('scores must be an object.')",
+    ]
+    for key in SCORE_KEYS:
+        lines += [
+            f"    if {key!r} not in scores:",
+            f"        raise ValueError('scores missing {key}')",
+            f"    value = scores[{key!r}]",
+            "    if not isinstance(value, int):",
+            f"        raise ValueError('scores.{key} must be an integer.')",
+            "    if not 0 <= value <= 100:",
+            f"        raise ValueError('scores.{key} must be 0-100.')",
+        ]
+    lines += [
+        "    if not isinstance(data['top_5_changes'], list):",
+        "        raise ValueError('top_5_changes must be a list.')",
+        "    for x in data['top_5_changes']:",
+        "        if not isinstance(x, str):",
+        "            raise ValueError('top_5_changes items must be strings.')",
+        "    rev = data['revenue_levers']",
+        "    if not isinstance(rev, dict):",
+        "        raise ValueError('revenue_levers must be an object.')",
+    ]
+    for key in ("conversion", "aov", "margin"):
+        lines += [
+            f"    lst = rev.get({key!r})",
+            "    if not isinstance(lst, list):",
+            f"        raise ValueError('revenue_levers.{key} must be a string list.')",
+            "    for x in lst:",
+            "        if not isinstance(x, str):",
+            f"            raise ValueError('revenue_levers.{key} must be a string list.')",
+        ]
+    for section, fields, label in (
+        ("rewrite_examples", ("original", "rewritten", "why_it_helps"), "rewrite_examples"),
+        ("ab_tests", ("hypothesis", "variant_a", "variant_b", "success_metric"), "ab_tests"),
+    ):
+        lines += [
+            f"    if not isinstance(data[{section!r}], list):",
+            f"        raise ValueError('{label} must be a list.')",
+            f"    for item in data[{section!r}]:",
+            "        if not isinstance(item, dict):",
+            f"            raise ValueError('{label} items must be objects.')",
+        ]
+        for field in fields:
+            lines += [
+                f"        if not isinstance(item.get({field!r}), str):",
+                f'            raise ValueError("{label} item missing string \'{field}\'.")',
+            ]
+    lines += [
+        "    if not isinstance(data['red_flags'], list):",
+        "        raise ValueError('red_flags must be a string list.')",
+        "    for x in data['red_flags']:",
+        "        if not isinstance(x, str):",
+        "            raise ValueError('red_flags must be a string list.')",
+        "    return data",
+    ]
+    namespace: dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<critique_validator>", "exec"), namespace)
+    return namespace["_validate"]
+
+
+_manual_validate_critique = _build_manual_validator()
+
+
+def _validate_critique(data: Any) -> dict[str, Any]:
+    if _VALIDATE_CRITIQUE is None:
+        return _manual_validate_critique(data)
+    try:
+        _VALIDATE_CRITIQUE(data)
+    except fastjsonschema.JsonSchemaException as exc:
+        raise ValueError(str(exc)) from exc
+    return data
+
+
+_CRITIQUE_SCHEMA_RESPONSE_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "menu_critic_output",
+        "schema": CRITIQUE_JSON_SCHEMA,
+        "strict": True,
+    },
+}
+
+
+def _log_analysis_start(menu_text: str, mode: str, goal: str, context: str | None) -> None:
+    if not logger.isEnabledFor(logging.INFO):
+        return
     logger.info(
         "Starting menu analysis: mode=%s goal=%s context_provided=%s text_chars=%s model=%s",
         mode,
@@ -521,36 +875,85 @@ def analyze_menu_text(
         len(menu_text or ""),
         TEXT_MODEL,
     )
-    system_prompt = _critique_system_prompt()
-    user_prompt = _critique_user_prompt(menu_text, mode, goal, context)
 
-    create_kwargs = dict(
+
+def _critique_create_kwargs(menu_text: str, mode: str, goal: str, context: str | None) -> dict[str, Any]:
+    mode_lower = mode.lower()
+    return dict(
         model=TEXT_MODEL,
-        temperature=0.35 if mode.lower().startswith("fix") else 1.0,
+        temperature=0.35 if mode_lower.startswith("fix") else 1.0,
         messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
+            {"role": "system", "content": _critique_system_prompt()},
+            {
+                "role": "user",
+                "content": _critique_user_prompt(
+                    menu_text, mode, goal, context, is_roast=mode_lower.startswith("roast")
+                ),
+            },
         ],
     )
 
-    raw_output = ""
+
+def _finalize_critique(
+    raw_output: str,
+    response_format_used: str,
+    usage_summary: dict[str, int | None] | None,
+) -> tuple[dict[str, Any], str, dict[str, Any]]:
+    if _CRITIQUE_DECODER is not None:
+        try:
+            validated = msgspec.to_builtins(_CRITIQUE_DECODER.decode(raw_output))
+        except msgspec.ValidationError as exc:
+            logger.warning("Text analysis returned JSON with invalid shape: %s", exc)
+            raise InvalidJSONResponse(raw_output=raw_output.strip(), message=f"JSON shape was invalid: {exc}") from exc
+        except msgspec.DecodeError as exc:
+            logger.warning("Text analysis returned invalid JSON. raw_len=%s", len(raw_output))
+            raise InvalidJSONResponse(raw_output=raw_output.strip()) from exc
+    else:
+        try:
+            parsed = _json_loads(raw_output)
+        except json.JSONDecodeError as exc:
+            logger.warning("Text analysis returned invalid JSON. raw_len=%s", len(raw_output))
+            raise InvalidJSONResponse(raw_output=raw_output.strip()) from exc
+
+        try:
+            validated = _validate_critique(parsed)
+        except ValueError as exc:
+            logger.warning("Text analysis returned JSON with invalid shape: %s", exc)
+            raise InvalidJSONResponse(raw_output=raw_output.strip(), message=f"JSON shape was invalid: {exc}") from exc
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Menu analysis complete: top_changes=%s rewrite_examples=%s ab_tests=%s",
+            len(validated.get("top_5_changes", [])),
+            len(validated.get("rewrite_examples", [])),
+            len(validated.get("ab_tests", [])),
+        )
+    meta = {
+        "model": TEXT_MODEL,
+        "response_format": response_format_used,
+        "usage": usage_summary or {"prompt_tokens": None, "completion_tokens": None, "total_tokens": None},
+        "raw_output_chars": len(raw_output),
+    }
+    return validated, raw_output, meta
+
+
+def analyze_menu_text(
+    client: Groq,
+    menu_text: str,
+    mode: str,
+    goal: str,
+    context: str | None = None,
+) -> tuple[dict[str, Any], str, dict[str, Any]]:
+    _log_analysis_start(menu_text, mode, goal, context)
+    create_kwargs = _critique_create_kwargs(menu_text, mode, goal, context)
+
     response_format_used = "json_schema"
-    usage_summary: dict[str, int | None] | None = None
     try:
         logger.debug("Requesting Groq structured output with json_schema.")
         resp = client.chat.completions.create(
             **create_kwargs,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "menu_critic_output",
-                    "schema": CRITIQUE_JSON_SCHEMA,
-                    "strict": True,
-                },
-            },
+            response_format=_CRITIQUE_SCHEMA_RESPONSE_FORMAT,
         )
-        raw_output = _chat_content_text(resp)
-        usage_summary = _usage_from_response(resp)
     except Exception as exc:
         if _is_rate_limit_error(exc):
             logger.warning("Text analysis hit rate limit-like error: %s", exc)
@@ -562,8 +965,6 @@ def analyze_menu_text(
                 **create_kwargs,
                 response_format={"type": "json_object"},
             )
-            raw_output = _chat_content_text(resp)
-            usage_summary = _usage_from_response(resp)
         except Exception as inner_exc:
             if _is_rate_limit_error(inner_exc):
                 logger.warning("Fallback text analysis hit rate limit-like error: %s", inner_exc)
@@ -571,32 +972,55 @@ def analyze_menu_text(
             logger.exception("Groq text analysis request failed.")
             raise MenuCriticError(f"Groq request failed: {inner_exc}") from inner_exc
 
-    try:
-        parsed = json.loads(raw_output)
-    except json.JSONDecodeError as exc:
-        logger.warning("Text analysis returned invalid JSON. raw_len=%s", len(raw_output))
-        raise InvalidJSONResponse(raw_output=raw_output) from exc
+    return _finalize_critique(_chat_content_text(resp), response_format_used, _usage_from_response(resp))
 
-    try:
-        validated = _manual_validate_critique(parsed)
-    except ValueError as exc:
-        logger.warning("Text analysis returned JSON with invalid shape: %s", exc)
-        raise InvalidJSONResponse(raw_output=raw_output, message=f"JSON shape was invalid: {exc}") from exc
 
-    logger.info(
-        "Menu analysis complete: top_changes=%s rewrite_examples=%s ab_tests=%s",
-        len(validated.get("top_5_changes", [])),
-        len(validated.get("rewrite_examples", [])),
-        len(validated.get("ab_tests", [])),
-    )
-    meta = {
-        "model": TEXT_MODEL,
-        "response_format": response_format_used,
-        "usage": usage_summary or {"prompt_tokens": None, "completion_tokens": None, "total_tokens": None},
-        "raw_output_chars": len(raw_output),
-    }
-    return validated, raw_output, meta
+async def aanalyze_menu_text(
+    client: AsyncGroq,
+    menu_text: str,
+    mode: str,
+    goal: str,
+    context: str | None = None,
+) -> tuple[dict[str, Any], str, dict[str, Any]]:
+    """Async variant of analyze_menu_text with rate-limit retries.
+
+    Pairs with aextract_menu_text_from_image so callers batching multiple
+    menus can overlap requests via asyncio.gather.
+    """
+    _log_analysis_start(menu_text, mode, goal, context)
+    create_kwargs = _critique_create_kwargs(menu_text, mode, goal, context)
+
+    async def _request() -> tuple[Any, str]:
+        try:
+            logger.debug("Requesting Groq structured output with json_schema.")
+            resp = await client.chat.completions.create(
+                **create_kwargs,
+                response_format=_CRITIQUE_SCHEMA_RESPONSE_FORMAT,
+            )
+            return resp, "json_schema"
+        except Exception as exc:
+            if _is_rate_limit_error(exc):
+                logger.warning("Text analysis hit rate limit-like error: %s", exc)
+                raise RateLimitLikeError(str(exc)) from exc
+            logger.warning("json_schema response format failed (%s). Falling back to json_object.", exc)
+            try:
+                resp = await client.chat.completions.create(
+                    **create_kwargs,
+                    response_format={"type": "json_object"},
+                )
+                return resp, "json_object"
+            except Exception as inner_exc:
+                if _is_rate_limit_error(inner_exc):
+                    logger.warning("Fallback text analysis hit rate limit-like error: %s", inner_exc)
+                    raise RateLimitLikeError(str(inner_exc)) from inner_exc
+                logger.exception("Groq text analysis request failed.")
+                raise MenuCriticError(f"Groq request failed: {inner_exc}") from inner_exc
+
+    resp, response_format_used = await _retry_rate_limited(_request)
+    return _finalize_critique(_chat_content_text(resp), response_format_used, _usage_from_response(resp))
 
 
 def dumps_pretty_json(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
     return json.dumps(data, indent=2, ensure_ascii=False)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import io
 import logging
 import time
 from pathlib import Path
@@ -9,6 +11,7 @@ import streamlit as st
 from ui_theme import render_sidebar_nav
 
 from menu_critic_core import (
+    MAX_IMAGE_UPLOAD_BYTES,
     MAX_TEXT_CHARS,
     MIN_EXTRACTED_TEXT_CHARS,
     MIN_VISION_CONFIDENCE,
@@ -18,6 +21,7 @@ from menu_critic_core import (
     RateLimitLikeError,
     SuspiciousMenuInputError,
     VisionExtractionError,
+    VisionExtractionResult,
     analyze_menu_text,
     clamp_text_input,
     dumps_pretty_json,
@@ -29,6 +33,8 @@ from menu_critic_core import (
 
 
 ASSETS_DIR = Path("assets")
+# Token bucket: refills one request per cooldown, with a small burst budget.
+RATE_LIMIT_BURST = 2.0
 logger = logging.getLogger(__name__)
 
 if not logging.getLogger().handlers:
@@ -40,9 +46,70 @@ if not logging.getLogger().handlers:
 st.set_page_config(page_title="Menu Critic", page_icon="🍽️", layout="wide")
 
 
-def _inject_styles() -> None:
-    st.markdown(
-        """
+@st.cache_resource(show_spinner=False)
+def _cached_groq_client(api_key: str):
+    # Persist the Groq client (and its HTTP connection pool) across reruns;
+    # keyed on the api_key so rotated secrets invalidate it.
+    return get_groq_client(api_key)
+
+
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def _cached_analyze(
+    menu_text: str, mode: str, goal: str, context: str | None
+) -> tuple[dict[str, Any], str, dict[str, Any]]:
+    # The client is fetched inside because it is not hashable as a cache key.
+    # A repeat of the same menu/mode/goal/context tuple skips the Groq
+    # round-trip entirely.
+    client = _cached_groq_client(st.secrets["GROQ_API_KEY"])
+    return analyze_menu_text(client=client, menu_text=menu_text, mode=mode, goal=goal, context=context)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _early_downscale(image_hash: str, _image_bytes: bytes) -> bytes:
+    # EXIF-aware downscale + JPEG recompress before the heavier preprocessing
+    # pipeline, so hashing, session storage, and the vision upload all work
+    # on ~1024px JPEG bytes instead of a multi-MB camera original. PIL is
+    # imported lazily so text-only sessions never load it.
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(_image_bytes)))
+    image.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
+    if image.mode in ("RGBA", "LA"):
+        # Mirror the core _to_rgb handling: composite transparency onto a
+        # white canvas instead of letting convert() drop the alpha channel.
+        rgba = image.convert("RGBA")
+        alpha = rgba.getchannel("A")
+        if alpha.getextrema() == (255, 255):
+            image = rgba.convert("RGB")
+        else:
+            base = Image.new("RGB", rgba.size, (255, 255, 255))
+            base.paste(rgba, mask=alpha)
+            image = base
+    else:
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=82, optimize=True)
+    return buffer.getvalue()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_preprocess(image_hash: str, _image_buffer: Any) -> tuple[bytes, dict[str, Any]]:
+    # Keyed on the content hash; the unhashable buffer object is excluded.
+    return preprocess_image_for_groq(_image_buffer)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_vision_extract(image_hash: str, _image_bytes: bytes) -> VisionExtractionResult:
+    # Re-uploads and post-invalid-JSON retries of the same image skip the
+    # vision-model round-trip entirely.
+    client = _cached_groq_client(st.secrets["GROQ_API_KEY"])
+    return extract_menu_text_from_image(client, _image_bytes)
+
+
+# Hoisted so the blob is built once at import; reruns only re-send it.
+# Skipping the re-send entirely is not an option: Streamlit drops elements
+# that are not emitted during a rerun, style tags included.
+_MC_CSS = """
         <style>
         :root {
           --mc-bg: #f7f4ee;
@@ -132,9 +199,33 @@ def _inject_styles() -> None:
           padding: 0.25rem;
         }
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+_HERO_HTML = """
+    <div class="mc-hero">
+      <div class="mc-kicker">AI-native Menu Optimization</div>
+      <h1>Menu Critic</h1>
+      <p>Critique restaurant menus for conversion, AOV, and guest experience. Run a serious optimization pass or a playful roast, then export strict JSON for demos, experiments, or workflows.</p>
+    </div>
+    """
+
+_HERO_CARDS = [
+    ("Two input modes", "Paste menu text or upload a JPG/PNG menu image."),
+    ("Two analysis styles", "Fix mode for revenue. Roast mode for demo-friendly fun."),
+    ("Structured output", "Strict JSON scorecards, rewrites, A/B tests, and red flags."),
+]
+
+# Joined once at import: one st.markdown per rerun instead of a zip/loop
+# over three columns, each emitting its own element.
+_HERO_CARDS_HTML = '<div style="display:flex; gap:0.8rem;">' + "".join(
+    f'<div class="mc-card" style="flex:1;"><h3>{title}</h3><p>{desc}</p></div>'
+    for title, desc in _HERO_CARDS
+) + "</div>"
+
+
+def _inject_styles() -> None:
+    st.markdown(_MC_CSS, unsafe_allow_html=True)
 
 
 def _show_gif(name: str, caption: str) -> None:
@@ -145,6 +236,12 @@ def _show_gif(name: str, caption: str) -> None:
         st.caption(f"[Missing asset: `{path}`] {caption}")
 
 
+@st.cache_data(show_spinner=False)
+def _read_asset_bytes(path_str: str, mtime: float) -> bytes:
+    # mtime participates in the cache key so edited sample files re-read.
+    return Path(path_str).read_bytes()
+
+
 def _first_existing_path(candidates: list[Path]) -> Path | None:
     for path in candidates:
         if path.exists() and path.is_file():
@@ -152,10 +249,13 @@ def _first_existing_path(candidates: list[Path]) -> Path | None:
     return None
 
 
-def _render_sample_downloads() -> None:
-    st.markdown('<div class="mc-section">Sample Inputs</div>', unsafe_allow_html=True)
-    st.caption("Use these sample files for demos. You can replace them with your own local assets.")
+_IMAGE_MIME_BY_SUFFIX = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _discover_assets() -> dict[str, Any]:
+    # Folds the exists/is_file stat probes and MIME resolution into one
+    # cached lookup; the short ttl picks up assets dropped in while running.
     text_path = _first_existing_path([Path("assets/sample_menu.txt"), Path("sample_menu.txt")])
     image_path = _first_existing_path(
         [
@@ -164,13 +264,29 @@ def _render_sample_downloads() -> None:
             Path("assets/sample_menu_image.jpeg"),
         ]
     )
+    return {
+        "text": text_path,
+        "image": image_path,
+        "image_mime": _IMAGE_MIME_BY_SUFFIX.get(image_path.suffix.lower(), "image/jpeg") if image_path else None,
+    }
+
+
+def _render_sample_downloads() -> None:
+    st.markdown('<div class="mc-section">Sample Inputs</div>', unsafe_allow_html=True)
+    st.caption("Use these sample files for demos. You can replace them with your own local assets.")
+
+    assets = _discover_assets()
+    text_path = assets["text"]
+    image_path = assets["image"]
 
     c1, c2 = st.columns(2)
     with c1:
         if text_path:
+            # Lazy data callable: bytes are read (and base64-encoded into the
+            # page) only when the button is actually clicked, not per rerun.
             st.download_button(
                 "Download Sample Menu Text",
-                data=text_path.read_bytes(),
+                data=lambda p=text_path: _read_asset_bytes(str(p), p.stat().st_mtime),
                 file_name=text_path.name,
                 mime="text/plain",
                 use_container_width=True,
@@ -179,12 +295,11 @@ def _render_sample_downloads() -> None:
             st.caption("Add `sample_menu.txt` (root or `assets/`) to enable text download.")
     with c2:
         if image_path:
-            mime = "image/png" if image_path.suffix.lower() == ".png" else "image/jpeg"
             st.download_button(
                 "Download Sample Menu Image",
-                data=image_path.read_bytes(),
+                data=lambda p=image_path: _read_asset_bytes(str(p), p.stat().st_mtime),
                 file_name=image_path.name,
-                mime=mime,
+                mime=assets["image_mime"],
                 use_container_width=True,
             )
         else:
@@ -194,55 +309,68 @@ def _render_sample_downloads() -> None:
 
 
 def _init_state() -> None:
-    st.session_state.setdefault("last_request_ts", 0.0)
-    st.session_state.setdefault("last_result", None)
-    st.session_state.setdefault("last_result_json_text", "")
-    st.session_state.setdefault("last_invalid_json_raw", "")
-    st.session_state.setdefault("last_invalid_json_error", "")
-    st.session_state.setdefault("last_critique_request", None)
-    st.session_state.setdefault("queued_retry", False)
-    st.session_state.setdefault("last_uploaded_image_bytes", None)
-    st.session_state.setdefault("last_uploaded_image_name", None)
-    st.session_state.setdefault("last_uploaded_image_mime", None)
-    st.session_state.setdefault("last_run_stats", None)
+    # One membership test on re-entry instead of a setdefault proxy call
+    # per key on every rerun.
+    if "_mc_initialized" in st.session_state:
+        return
+    st.session_state.update(
+        {
+            "rl_tokens": RATE_LIMIT_BURST,
+            "rl_last": None,
+            "last_result": None,
+            "last_invalid_json_raw": "",
+            "last_invalid_json_error": "",
+            "last_critique_request": None,
+            "queued_retry": False,
+            "last_uploaded_image_bytes": None,
+            "last_uploaded_image_name": None,
+            "last_uploaded_image_mime": None,
+            "last_image_hash": None,
+            "last_run_stats": None,
+            "_mc_initialized": True,
+        }
+    )
 
 
 def _clear_last_result_view() -> None:
     st.session_state["last_result"] = None
-    st.session_state["last_result_json_text"] = ""
     st.session_state["last_run_stats"] = None
 
 
+_SCORECARD_FIELDS = [
+    ("Clarity", "clarity"),
+    ("Pricing Psychology", "pricing_psychology"),
+    ("Upsell Potential", "upsell_potential"),
+    ("Menu Structure", "menu_structure"),
+    ("Dietary Signals", "dietary_signals"),
+]
+
+
+@st.fragment
 def _render_scorecard(scores: dict[str, int]) -> None:
     st.markdown('<div class="mc-section">Scorecard</div>', unsafe_allow_html=True)
-    c1, c2, c3, c4, c5 = st.columns(5)
-    c1.metric("Clarity", scores["clarity"])
-    c2.metric("Pricing Psychology", scores["pricing_psychology"])
-    c3.metric("Upsell Potential", scores["upsell_potential"])
-    c4.metric("Menu Structure", scores["menu_structure"])
-    c5.metric("Dietary Signals", scores["dietary_signals"])
+    for col, (label, key) in zip(st.columns(len(_SCORECARD_FIELDS)), _SCORECARD_FIELDS):
+        col.metric(label, scores[key])
 
 
+# Each section below emits one markdown payload instead of one st.write
+# per item: a full result used to ship 30-50 element deltas to the
+# frontend, now it is a handful.
 def _render_list_section(title: str, items: list[str]) -> None:
     st.markdown(f'<div class="mc-section">{title}</div>', unsafe_allow_html=True)
     if not items:
         st.write("No items returned.")
         return
-    for idx, item in enumerate(items, start=1):
-        st.write(f"{idx}. {item}")
+    st.markdown("\n".join(f"{idx}. {item}" for idx, item in enumerate(items, start=1)))
 
 
 def _render_revenue_levers(revenue_levers: dict[str, list[str]]) -> None:
     st.markdown('<div class="mc-section">Revenue Levers</div>', unsafe_allow_html=True)
     cols = st.columns(3)
     for col, key, label in zip(cols, ["conversion", "aov", "margin"], ["Conversion", "AOV", "Margin"]):
-        with col:
-            st.markdown(f"**{label}**")
-            items = revenue_levers.get(key, [])
-            if not items:
-                st.write("-")
-            for item in items:
-                st.write(f"- {item}")
+        items = revenue_levers.get(key, [])
+        bullets = "\n".join(f"- {item}" for item in items) if items else "-"
+        col.markdown(f"**{label}**\n{bullets}")
 
 
 def _render_rewrite_examples(items: list[dict[str, str]]) -> None:
@@ -252,10 +380,12 @@ def _render_rewrite_examples(items: list[dict[str, str]]) -> None:
         return
     for idx, item in enumerate(items, start=1):
         with st.container(border=True):
-            st.markdown(f"**Example {idx}**")
-            st.write(f"**Original:** {item.get('original', '')}")
-            st.write(f"**Rewritten:** {item.get('rewritten', '')}")
-            st.write(f"**Why it helps:** {item.get('why_it_helps', '')}")
+            st.markdown(
+                f"**Example {idx}**\n\n"
+                f"**Original:** {item.get('original', '')}\n\n"
+                f"**Rewritten:** {item.get('rewritten', '')}\n\n"
+                f"**Why it helps:** {item.get('why_it_helps', '')}"
+            )
 
 
 def _render_ab_tests(items: list[dict[str, str]]) -> None:
@@ -265,13 +395,15 @@ def _render_ab_tests(items: list[dict[str, str]]) -> None:
         return
     for idx, item in enumerate(items, start=1):
         with st.expander(f"Test {idx}: {item.get('hypothesis', 'Hypothesis')}"):
-            st.write(f"**Hypothesis:** {item.get('hypothesis', '')}")
-            st.write(f"**Variant A:** {item.get('variant_a', '')}")
-            st.write(f"**Variant B:** {item.get('variant_b', '')}")
-            st.write(f"**Success metric:** {item.get('success_metric', '')}")
+            st.markdown(
+                f"**Hypothesis:** {item.get('hypothesis', '')}\n\n"
+                f"**Variant A:** {item.get('variant_a', '')}\n\n"
+                f"**Variant B:** {item.get('variant_b', '')}\n\n"
+                f"**Success metric:** {item.get('success_metric', '')}"
+            )
 
 
-def _render_result(result: dict[str, Any], json_text: str) -> None:
+def _render_result(result: dict[str, Any]) -> None:
     _render_scorecard(result["scores"])
     _render_list_section("Top 5 Changes", result["top_5_changes"])
     _render_revenue_levers(result["revenue_levers"])
@@ -279,9 +411,11 @@ def _render_result(result: dict[str, Any], json_text: str) -> None:
     _render_ab_tests(result["ab_tests"])
     _render_list_section("Red Flags", result["red_flags"])
 
+    # Serialized lazily on click, so the JSON text is neither mirrored in
+    # session_state nor base64-encoded into the page on every rerun.
     st.download_button(
         label="Download JSON",
-        data=json_text,
+        data=lambda r=result: dumps_pretty_json(r).encode("utf-8"),
         file_name="menu_critic_output.json",
         mime="application/json",
         use_container_width=True,
@@ -356,6 +490,23 @@ def _render_reference_panel(last_request: dict[str, Any]) -> None:
             st.text(last_request.get("menu_text", ""))
 
 
+@st.fragment
+def _render_results_block() -> None:
+    # Reads everything from session_state so interactions inside the block
+    # (expanders, downloads) rerun just this fragment, and edits elsewhere
+    # on the page skip the whole results pipeline.
+    last_result = st.session_state.get("last_result")
+    if not last_result:
+        return
+    last_request = st.session_state.get("last_critique_request") or {}
+    results_col, ref_col = st.columns([1.6, 0.9], vertical_alignment="top")
+    with results_col:
+        _render_result(last_result)
+    with ref_col:
+        _render_run_stats(st.session_state.get("last_run_stats"))
+        _render_reference_panel(last_request)
+
+
 def _build_critique_request(
     input_mode: str,
     menu_text_input: str,
@@ -363,26 +514,27 @@ def _build_critique_request(
     mode: str,
     goal: str,
     context: str,
-    client: Any,
 ) -> dict[str, Any]:
+    context_stripped = context.strip()
     if input_mode == "Paste menu text":
         menu_text = clamp_text_input(menu_text_input)
         if not menu_text:
             logger.info("Analyze blocked: empty pasted text input.")
             raise ValueError("Please paste menu text before analyzing.")
         validate_menu_like_text(menu_text, source="text")
-        logger.info(
-            "Preparing text-based critique request: mode=%s goal=%s chars=%s context_provided=%s",
-            mode,
-            goal,
-            len(menu_text),
-            bool(context.strip()),
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Preparing text-based critique request: mode=%s goal=%s chars=%s context_provided=%s",
+                mode,
+                goal,
+                len(menu_text),
+                bool(context_stripped),
+            )
         return {
             "menu_text": menu_text,
             "mode": mode,
             "goal": goal,
-            "context": context.strip(),
+            "context": context_stripped,
             "source": "text",
         }
 
@@ -391,20 +543,42 @@ def _build_critique_request(
         raise ValueError("Please upload a menu image before analyzing.")
 
     image_bytes = uploaded_image.getvalue()
-    st.session_state["last_uploaded_image_bytes"] = image_bytes
+    if len(image_bytes) > MAX_IMAGE_UPLOAD_BYTES:
+        size_mb = len(image_bytes) / (1024 * 1024)
+        logger.warning("Rejected image upload: size=%s bytes exceeds limit=%s.", len(image_bytes), MAX_IMAGE_UPLOAD_BYTES)
+        raise ValueError(
+            f"Image is too large ({size_mb:.1f} MB). Please upload an image under "
+            f"{MAX_IMAGE_UPLOAD_BYTES // (1024 * 1024)} MB."
+        )
     st.session_state["last_uploaded_image_name"] = getattr(uploaded_image, "name", "menu_image")
-    st.session_state["last_uploaded_image_mime"] = getattr(uploaded_image, "type", None)
-    logger.info(
-        "Preparing image-based critique request: filename=%s bytes=%s mode=%s goal=%s",
-        st.session_state["last_uploaded_image_name"],
-        len(image_bytes),
-        mode,
-        goal,
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Preparing image-based critique request: filename=%s bytes=%s mode=%s goal=%s",
+            st.session_state["last_uploaded_image_name"],
+            len(image_bytes),
+            mode,
+            goal,
+        )
 
-    data_url, image_meta = preprocess_image_for_groq(uploaded_image)
+    image_hash = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+    previous_request = st.session_state.get("last_critique_request")
+    if (
+        image_hash == st.session_state.get("last_image_hash")
+        and previous_request is not None
+        and previous_request.get("source") == "image"
+    ):
+        # Same image as last run: reuse the prior extraction wholesale and
+        # only refresh the knobs that may have changed.
+        logger.info("Unchanged image upload detected; skipping vision extraction.")
+        return {**previous_request, "mode": mode, "goal": goal, "context": context_stripped}
+    image_bytes = _early_downscale(image_hash, image_bytes)
+    preprocessed_bytes, image_meta = _cached_preprocess(image_hash, io.BytesIO(image_bytes))
+    # Keep the downscaled JPEG for the reference panel, not the multi-MB raw
+    # upload: smaller session footprint and cheaper st.image re-encodes.
+    st.session_state["last_uploaded_image_bytes"] = preprocessed_bytes
+    st.session_state["last_uploaded_image_mime"] = "image/jpeg"
     vision_started = time.perf_counter()
-    vision_result = extract_menu_text_from_image(client, data_url)
+    vision_result = _cached_vision_extract(image_hash, preprocessed_bytes)
     vision_latency_ms = int((time.perf_counter() - vision_started) * 1000)
     extracted_text = clamp_text_input(vision_result.menu_text)
 
@@ -428,17 +602,19 @@ def _build_critique_request(
         raise VisionExtractionError(msg + " " + " | ".join(details), raw_output=vision_result.raw)
 
     validate_menu_like_text(extracted_text, source="image")
-    logger.info(
-        "Image-based critique request ready: extracted_chars=%s confidence=%.2f meta=%s",
-        len(extracted_text),
-        vision_result.confidence,
-        image_meta,
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Image-based critique request ready: extracted_chars=%s confidence=%.2f meta=%s",
+            len(extracted_text),
+            vision_result.confidence,
+            image_meta,
+        )
+    st.session_state["last_image_hash"] = image_hash
     return {
         "menu_text": extracted_text,
         "mode": mode,
         "goal": goal,
-        "context": context.strip(),
+        "context": context_stripped,
         "source": "image",
         "vision_confidence": vision_result.confidence,
         "vision_notes": vision_result.notes,
@@ -450,42 +626,28 @@ def _build_critique_request(
 
 
 def _enforce_rate_limit() -> None:
-    now = time.time()
-    delta = now - float(st.session_state.get("last_request_ts", 0.0))
-    if delta < REQUEST_COOLDOWN_SECONDS:
-        wait = int(REQUEST_COOLDOWN_SECONDS - delta + 0.999)
+    # Token bucket on the monotonic clock: immune to NTP jumps, and the
+    # burst budget absorbs an occasional quick follow-up request.
+    now = time.monotonic()
+    last = st.session_state.get("rl_last")
+    tokens = float(st.session_state.get("rl_tokens", RATE_LIMIT_BURST))
+    if last is not None:
+        tokens = min(RATE_LIMIT_BURST, tokens + (now - last) / REQUEST_COOLDOWN_SECONDS)
+    st.session_state["rl_last"] = now
+    if tokens < 1.0:
+        st.session_state["rl_tokens"] = tokens
+        wait = int((1.0 - tokens) * REQUEST_COOLDOWN_SECONDS + 0.999)
         logger.info("Session rate limit triggered. wait_seconds=%s", wait)
         raise ValueError(f"Please wait {wait}s before sending another request.")
-    st.session_state["last_request_ts"] = now
+    st.session_state["rl_tokens"] = tokens - 1.0
 
 
 _init_state()
 _inject_styles()
 render_sidebar_nav("menu_critic")
 
-st.markdown(
-    """
-    <div class="mc-hero">
-      <div class="mc-kicker">AI-native Menu Optimization</div>
-      <h1>Menu Critic</h1>
-      <p>Critique restaurant menus for conversion, AOV, and guest experience. Run a serious optimization pass or a playful roast, then export strict JSON for demos, experiments, or workflows.</p>
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
-
-hero_cols = st.columns(3)
-hero_cards = [
-    ("Two input modes", "Paste menu text or upload a JPG/PNG menu image."),
-    ("Two analysis styles", "Fix mode for revenue. Roast mode for demo-friendly fun."),
-    ("Structured output", "Strict JSON scorecards, rewrites, A/B tests, and red flags."),
-]
-for col, (title, desc) in zip(hero_cols, hero_cards):
-    with col:
-        st.markdown(
-            f'<div class="mc-card"><h3>{title}</h3><p>{desc}</p></div>',
-            unsafe_allow_html=True,
-        )
+st.markdown(_HERO_HTML, unsafe_allow_html=True)
+st.markdown(_HERO_CARDS_HTML, unsafe_allow_html=True)
 
 _render_sample_downloads()
 
@@ -510,43 +672,46 @@ if not api_key:
     st.code('GROQ_API_KEY = "your_groq_api_key_here"', language="toml")
     st.stop()
 
-left, right = st.columns([1.2, 0.8], vertical_alignment="top")
+# The whole input panel lives in a form so edits (keystrokes, radio
+# flips, dropdown changes) buffer client-side instead of each triggering
+# a full script rerun; the script only re-executes on Analyze.
+with st.form("critique_form"):
+    left, right = st.columns([1.2, 0.8], vertical_alignment="top")
+
+    with left:
+        input_mode = st.radio("Input type", ["Paste menu text", "Upload menu image"], horizontal=True)
+        menu_text_input = st.text_area(
+            "Menu text",
+            height=260,
+            placeholder="Paste your menu text here...",
+            help=f"Max {MAX_TEXT_CHARS:,} characters.",
+        )
+        uploaded_image = st.file_uploader(
+            "Menu image (JPG/PNG)",
+            type=["jpg", "jpeg", "png"],
+            accept_multiple_files=False,
+            help="Use a clear, readable image for best extraction results.",
+        )
 
-with left:
-    input_mode = st.radio("Input type", ["Paste menu text", "Upload menu image"], horizontal=True)
-    menu_text_input = st.text_area(
-        "Menu text",
-        height=260,
-        placeholder="Paste your menu text here...",
-        help=f"Max {MAX_TEXT_CHARS:,} characters.",
-        disabled=input_mode != "Paste menu text",
-    )
-    uploaded_image = st.file_uploader(
-        "Menu image (JPG/PNG)",
-        type=["jpg", "jpeg", "png"],
-        accept_multiple_files=False,
-        disabled=input_mode != "Upload menu image",
-        help="Use a clear, readable image for best extraction results.",
-    )
-    if uploaded_image is not None and input_mode == "Upload menu image":
-        with st.expander("Preview uploaded image", expanded=False):
-            st.image(uploaded_image, caption="Uploaded image preview", width=280)
-
-with right:
-    mode = st.radio(
-        "Mode",
-        ["Fix my menu", "Roast my menu"],
-        help="Roast mode is playful and critiques the menu, not people.",
-    )
-    goal = st.selectbox(
-        "Primary goal",
-        ["Increase conversion", "Increase AOV", "Improve experience & retention"],
-    )
-    context = st.text_input(
-        "Optional context (cuisine / restaurant type)",
-        placeholder="e.g., fast-casual Thai, brunch cafe, pizza delivery",
-    )
-    analyze_clicked = st.button("Analyze", type="primary", use_container_width=True)
+    with right:
+        mode = st.radio(
+            "Mode",
+            ["Fix my menu", "Roast my menu"],
+            help="Roast mode is playful and critiques the menu, not people.",
+        )
+        goal = st.selectbox(
+            "Primary goal",
+            ["Increase conversion", "Increase AOV", "Improve experience & retention"],
+        )
+        context = st.text_input(
+            "Optional context (cuisine / restaurant type)",
+            placeholder="e.g., fast-casual Thai, brunch cafe, pizza delivery",
+        )
+        analyze_clicked = st.form_submit_button("Analyze", type="primary", use_container_width=True)
+
+if uploaded_image is not None and input_mode == "Upload menu image":
+    with st.expander("Preview uploaded image", expanded=False):
+        st.image(uploaded_image, caption="Uploaded image preview", width=280)
 
 retry_clicked = False
 if st.session_state.get("last_invalid_json_raw"):
@@ -568,7 +733,9 @@ if request_to_run:
         if request_to_run == "new":
             _clear_last_result_view()
         _enforce_rate_limit()
-        client = get_groq_client(api_key)
+        # Warm the cached client (and surface setup errors early); the
+        # analyze/vision helpers fetch it from the cache themselves.
+        _cached_groq_client(api_key)
 
         spinner_message = "Analyzing your menu..."
         if request_to_run == "new" and input_mode == "Upload menu image":
@@ -586,7 +753,6 @@ if request_to_run:
                     mode=mode,
                     goal=goal,
                     context=context,
-                    client=client,
                 )
                 st.session_state["last_critique_request"] = critique_request
                 st.session_state["last_invalid_json_raw"] = ""
@@ -597,18 +763,16 @@ if request_to_run:
                 logger.info("Retrying previous critique request. source=%s", critique_request.get("source"))
 
             critique_started = time.perf_counter()
-            result, _raw_json, critique_meta = analyze_menu_text(
-                client=client,
-                menu_text=critique_request["menu_text"],
-                mode=critique_request["mode"],
-                goal=critique_request["goal"],
-                context=critique_request.get("context"),
+            result, _raw_json, critique_meta = _cached_analyze(
+                critique_request["menu_text"],
+                critique_request["mode"],
+                critique_request["goal"],
+                critique_request.get("context"),
             )
             critique_latency_ms = int((time.perf_counter() - critique_started) * 1000)
             total_latency_ms = int((time.perf_counter() - total_started) * 1000)
 
         st.session_state["last_result"] = result
-        st.session_state["last_result_json_text"] = dumps_pretty_json(result)
         st.session_state["last_invalid_json_raw"] = ""
         st.session_state["last_invalid_json_error"] = ""
         st.session_state["last_run_stats"] = {
@@ -685,15 +849,7 @@ if request_to_run:
         st.error(f"Unexpected error: {exc}")
         _show_gif("sad.gif", "Unexpected plot twist.")
 
-last_result = st.session_state.get("last_result")
-if last_result:
-    last_request = st.session_state.get("last_critique_request") or {}
-    results_col, ref_col = st.columns([1.6, 0.9], vertical_alignment="top")
-    with results_col:
-        _render_result(last_result, st.session_state["last_result_json_text"])
-    with ref_col:
-        _render_run_stats(st.session_state.get("last_run_stats"))
-        _render_reference_panel(last_request)
+_render_results_block()
 
 if st.session_state.get("last_invalid_json_raw") and not request_to_run:
     logger.info("Showing persisted invalid JSON raw output panel.")
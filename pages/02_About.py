@@ -1,6 +1,6 @@
 import streamlit as st
 
-from ui_theme import inject_ui_theme, render_hero, render_info_cards, render_sidebar_nav, section_heading
+from ui_theme import InfoCard, inject_ui_theme, render_hero, render_info_cards, render_sidebar_nav, section_heading
 
 
 st.set_page_config(page_title="About | Menu Critic", page_icon="ℹ️", layout="wide")
@@ -18,11 +18,11 @@ render_hero(
 )
 
 render_info_cards(
-    [
-        ("Input flexibility", "Works with pasted menu text or uploaded menu images."),
-        ("Dual mode", "Serious optimization mode and playful roast mode."),
-        ("Structured output", "Returns scores, rewrites, tests, and red flags in strict JSON."),
-    ]
+    (
+        InfoCard("Input flexibility", "Works with pasted menu text or uploaded menu images."),
+        InfoCard("Dual mode", "Serious optimization mode and playful roast mode."),
+        InfoCard("Structured output", "Returns scores, rewrites, tests, and red flags in strict JSON."),
+    )
 )
 
 section_heading("What it does")
@@ -60,7 +60,7 @@ st.markdown(
     <div class="mc-card">
       <ul class="mc-list">
         <li>Uses <code>GROQ_API_KEY</code> from Streamlit secrets (never hardcoded).</li>
-        <li>Session rate limiting: one request every 10 seconds.</li>
+        <li>Session rate limiting: requests refill at one per 10 seconds, with a burst of 2.</li>
         <li>Input caps for text and images; images are resized/compressed before vision requests.</li>
         <li>Friendly fallback states for rate limits, invalid JSON, and image parsing failures.</li>
         <li>Roast mode is constrained to be playful and non-harassing.</li>
@@ -1,6 +1,6 @@
 import streamlit as st
 
-from ui_theme import inject_ui_theme, render_hero, render_info_cards, render_sidebar_nav, section_heading
+from ui_theme import InfoCard, inject_ui_theme, render_hero, render_info_cards, render_sidebar_nav, section_heading
 
 
 st.set_page_config(page_title="Why I Built This | Menu Critic", page_icon="💼", layout="wide")
@@ -18,11 +18,11 @@ render_hero(
 )
 
 render_info_cards(
-    [
-        ("Merchant pain", "Great food still loses orders when menus are unclear or undersell value."),
-        ("AI fit", "Vision extraction + structured critique compresses manual review work."),
-        ("Product angle", "Turns feedback into experiments and rewrites that can be measured."),
-    ]
+    (
+        InfoCard("Merchant pain", "Great food still loses orders when menus are unclear or undersell value."),
+        InfoCard("AI fit", "Vision extraction + structured critique compresses manual review work."),
+        InfoCard("Product angle", "Turns feedback into experiments and rewrites that can be measured."),
+    )
 )
 
 section_heading("The pitch")
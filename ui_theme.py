@@ -1,10 +1,48 @@
-import streamlit as st
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from html import escape
+from typing import Sequence
 
+_st_cached = None
 
-def inject_ui_theme() -> None:
-    st.markdown(
-        """
-        <style>
+
+def _st():
+    # Streamlit's import graph is heavy (tornado, pyarrow, ...). Deferring
+    # it to first render keeps `import ui_theme` cheap for anything that
+    # only wants the constants or InfoCard.
+    global _st_cached
+    if _st_cached is None:
+        import streamlit
+
+        _st_cached = streamlit
+    return _st_cached
+
+
+@dataclass(frozen=True, slots=True)
+class InfoCard:
+    """A title/description pair for :func:`render_info_cards`.
+
+    Frozen + slots keeps instances small and hashable, and the interned
+    strings dedupe the repeated copy that pages pass on every rerun.
+    """
+
+    title: str
+    desc: str
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "title", sys.intern(self.title))
+        object.__setattr__(self, "desc", sys.intern(self.desc))
+
+
+# Hoisted so the blob is built once at import; reruns only re-send it.
+# Gating the injection behind session_state is not an option: Streamlit
+# drops elements that are not emitted during a rerun, style tags included.
+# Kept as a tuple of rule groups so a future variant (e.g. a dark theme)
+# can swap segments and re-join in one allocation instead of string math.
+_CSS_SEGMENTS: tuple[str, ...] = (
+    """
         :root {
           --mc-bg: #f7f4ee;
           --mc-ink: #1f2a2e;
@@ -24,6 +62,8 @@ def inject_ui_theme() -> None:
         section[data-testid="stSidebar"] div[data-testid="stSidebarNav"] ul li:first-child {
           display: none;
         }
+    """,
+    """
         .mc-hero {
           background: linear-gradient(135deg, #fff, #fff7ef 55%, #eefaf7);
           border: 1px solid var(--mc-border);
@@ -55,6 +95,8 @@ def inject_ui_theme() -> None:
           color: var(--mc-muted);
           font-size: 0.97rem;
         }
+    """,
+    """
         .mc-card {
           background: var(--mc-card);
           border: 1px solid var(--mc-border);
@@ -73,6 +115,14 @@ def inject_ui_theme() -> None:
           color: var(--mc-muted);
           font-size: 0.92rem;
         }
+        .mc-card-grid {
+          display: grid;
+          grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+          gap: 0.8rem;
+        }
+        .mc-card-grid .mc-card { margin-bottom: 0; }
+    """,
+    """
         .mc-section {
           margin-top: 0.75rem;
           margin-bottom: 0.4rem;
@@ -88,62 +138,123 @@ def inject_ui_theme() -> None:
         }
         .mc-list li { margin-bottom: 0.35rem; }
         .mc-muted { color: var(--mc-muted); }
-        </style>
-        """,
-        unsafe_allow_html=True,
+    """,
+)
+
+_CSS = "<style>%s</style>" % "".join(_CSS_SEGMENTS)
+
+# Minified once at import: roughly halves the bytes shipped over the
+# websocket per rerun and the tokens the browser's CSS lexer chews on,
+# while the source above stays readable.
+_CSS_MIN = re.sub(r"\s*([:;{},])\s*", r"\1", re.sub(r"\s+", " ", _CSS)).strip()
+
+
+# Markup templates hoisted to module scope: %-formatting against a
+# pre-built template skips re-tokenizing the literal on every call. The
+# hero goes one step further — its static scaffold is pre-split so the
+# cache-miss path is a straight concatenation of seven known strings,
+# which CPython flattens into a single allocation.
+_HERO_HEAD = '<div class="mc-hero"><div class="mc-kicker">'
+_HERO_MID1 = "</div><h1>"
+_HERO_MID2 = "</h1><p>"
+_HERO_TAIL = "</p></div>"
+_CARD_TMPL = '<div class="mc-card"><h3>%s</h3><p>%s</p></div>'
+_SECTION_TMPL = '<div class="mc-section">%s</div>'
+
+
+# Caller-provided copy is escaped before interpolation; the lru_cache
+# means the common case — identical titles on every rerun — is a dict
+# hit instead of escape + format + allocate.
+@lru_cache(maxsize=256)
+def _hero_html(title: str, description: str, kicker: str) -> str:
+    return (
+        _HERO_HEAD + escape(kicker) + _HERO_MID1 + escape(title) + _HERO_MID2 + escape(description) + _HERO_TAIL
     )
 
 
+@lru_cache(maxsize=256)
+def _card_html(title: str, desc: str) -> str:
+    return _CARD_TMPL % (escape(title), escape(desc))
+
+
+@lru_cache(maxsize=128)
+def _section_html(title: str) -> str:
+    return _SECTION_TMPL % escape(title)
+
+
+@lru_cache(maxsize=128)
+def _card_md(markdown_text: str) -> str:
+    return '<div class="mc-card">%s</div>' % markdown_text
+
+
+# Everything below is raw HTML, so it goes through st.html rather than
+# st.markdown(unsafe_allow_html=True) — no markdown parse on content
+# that contains no markdown. card_markdown is the one exception: its
+# payload really is markdown and keeps the parser.
+def inject_ui_theme() -> None:
+    _st().html(_CSS_MIN)
+
+
 def render_hero(title: str, description: str, kicker: str) -> None:
-    st.markdown(
-        f"""
-        <div class="mc-hero">
-          <div class="mc-kicker">{kicker}</div>
-          <h1>{title}</h1>
-          <p>{description}</p>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    _st().html(_hero_html(title, description, kicker))
 
 
-def render_info_cards(cards: list[tuple[str, str]]) -> None:
-    cols = st.columns(len(cards))
-    for col, (title, desc) in zip(cols, cards):
-        with col:
-            st.markdown(
-                f'<div class="mc-card"><h3>{title}</h3><p>{desc}</p></div>',
-                unsafe_allow_html=True,
-            )
+def render_info_cards(cards: Sequence[InfoCard]) -> None:
+    # One CSS-grid emission instead of st.columns plus a delta per card:
+    # N+1 frontend messages collapse into a single st.html call. join over
+    # a materialized list lets str.join pre-size its buffer in one pass.
+    parts = [_card_html(card.title, card.desc) for card in cards]
+    _st().html('<div class="mc-card-grid">%s</div>' % "".join(parts))
 
 
 def section_heading(title: str) -> None:
-    st.markdown(f'<div class="mc-section">{title}</div>', unsafe_allow_html=True)
+    _st().html(_section_html(title))
 
 
 def card_markdown(markdown_text: str) -> None:
-    st.markdown(f'<div class="mc-card">{markdown_text}</div>', unsafe_allow_html=True)
+    # The wrapped string is memoized; the markdown itself still has to go
+    # through st.markdown because the payload genuinely is markdown and we
+    # carry no server-side markdown renderer.
+    _st().markdown(_card_md(markdown_text), unsafe_allow_html=True)
+
+
+# Static navigation table, interned once at import instead of rebuilt
+# per rerun: (script path, label, icon).
+_NAV_ITEMS = (
+    ("pages/01_Menu_Critic.py", "Menu Critic", "🍽️"),
+    ("pages/02_About.py", "About", "ℹ️"),
+    ("pages/03_Why_I_Built_This.py", "Why I Built This", "💼"),
+)
+
+# Header and caption fused into one pre-rendered block: a single st.html
+# emission instead of a markdown parse plus a caption delta per rerun.
+_SIDEBAR_HEADER = (
+    '<h3 style="margin:0">Menu Critic</h3>'
+    '<div style="color:var(--mc-muted);font-size:0.85rem;margin-bottom:0.5rem">'
+    "AI-native menu review</div>"
+)
+
+
+# Which nav entry is disabled (= the current page), per active_page
+# value, in _NAV_ITEMS order: one dict lookup per rerun instead of three
+# string comparisons.
+_DISABLED_BY_PAGE = {
+    "menu_critic": (True, False, False),
+    "about": (False, True, False),
+    "why": (False, False, True),
+}
 
 
 def render_sidebar_nav(active_page: str) -> None:
-    with st.sidebar:
-        st.markdown("### Menu Critic")
-        st.caption("AI-native menu review")
-        st.page_link(
-            "pages/01_Menu_Critic.py",
-            label="Menu Critic",
-            icon="🍽️",
-            disabled=active_page == "menu_critic",
-        )
-        st.page_link(
-            "pages/02_About.py",
-            label="About",
-            icon="ℹ️",
-            disabled=active_page == "about",
-        )
-        st.page_link(
-            "pages/03_Why_I_Built_This.py",
-            label="Why I Built This",
-            icon="💼",
-            disabled=active_page == "why",
-        )
+    # st.page_link navigates client-side and keeps the Streamlit session
+    # (and with it last_result, the critique request, and the rate-limit
+    # bucket) alive across page switches; raw anchors would reload the
+    # browser tab and start a fresh session. Attribute-access form skips
+    # the with-block's __enter__/__exit__ push/pop per rerun.
+    sidebar = _st().sidebar
+    sidebar.html(_SIDEBAR_HEADER)
+    # Unknown active_page values degrade to all links enabled, matching the
+    # baseline equality checks.
+    disabled_flags = _DISABLED_BY_PAGE.get(active_page, (False, False, False))
+    for (path, label, icon), disabled in zip(_NAV_ITEMS, disabled_flags):
+        sidebar.page_link(path, label=label, icon=icon, disabled=disabled)